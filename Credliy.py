@@ -1,64 +1,314 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+import aiohttp
+import cachetools
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone
 
+try:
+    # orjson parses Credly's nested badge payload noticeably faster than the
+    # stdlib; its decode errors subclass ValueError, so handling is unchanged.
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Shared session so batch verifications reuse one keep-alive TLS connection
+# to www.credly.com instead of paying a fresh handshake per badge.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0))
+_SESSION.headers["User-Agent"] = "Mozilla/5.0"
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limits and transient server errors.
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Credly badge IDs are always GUIDs; rejecting anything else locally saves
+# a wasted round trip that would only come back as a 404.
+_BADGE_ID_RE = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE
+)
+
+# In-process cache of verified badge payloads, so re-verifying the same
+# badge (profile re-render, repeated PDF runs) skips the API round trip.
+_BADGE_CACHE = cachetools.TTLCache(maxsize=4096, ttl=3600)
+_BADGE_CACHE_LOCK = threading.Lock()
+
+
+def _get_with_retry(url, timeout=10, max_retries=3, base=1.0, cap=30.0, jitter=0.5):
+    """
+    Issues a GET with bounded exponential backoff and jitter.
+
+    Timeouts, connection errors and retryable statuses (429/5xx) are retried
+    with a delay of min(cap, base * 2**attempt) scaled by a random jitter
+    factor. Any other response (including 404) is returned immediately so the
+    caller can fail fast. If all retries are exhausted, the last error is
+    re-raised.
+    """
+    last_error = None
+    for attempt in range(max_retries):
+        try:
+            response = _SESSION.get(url, timeout=timeout)
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            response.raise_for_status()
+        except (requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.HTTPError) as e:
+            last_error = e
+        if attempt < max_retries - 1:
+            delay = min(cap, base * 2 ** attempt) * (1 + random.uniform(-jitter, jitter))
+            time.sleep(delay)
+    raise last_error
+
+
+def _is_expired(expires_at_str, now_utc=None):
+    """
+    Checks an ISO-8601 expires_at timestamp against the current time.
+
+    UTC ISO-8601 strings are lexicographically ordered, so well-shaped UTC
+    values (ending in Z/+00:00) compare directly against now's isoformat
+    without parsing or allocating a datetime. Everything else — other UTC
+    offsets, non-strings — falls back to datetime.fromisoformat, which
+    raises ValueError/TypeError on malformed input as before.
+    """
+    if isinstance(expires_at_str, str):
+        expires_iso = expires_at_str.replace('Z', '+00:00')
+        if (len(expires_iso) >= 19 and expires_iso[4] == '-' and expires_iso[10] == 'T'
+                and expires_iso.endswith('+00:00')):
+            return expires_iso < (now_utc or datetime.now(timezone.utc)).isoformat()
+    return datetime.fromisoformat(expires_at_str) < (now_utc or datetime.now(timezone.utc))
+
+
 class CredlyBadgeVerification:
-    def verify(badge_id):
+    @staticmethod
+    def verify(badge_id, now_utc=None):
         """
         Verifies a Credly digital badge using its public API endpoint.
 
         This function performs technical validity checks. If verification fails at
-        any step, it prints a descriptive log of the failure and returns None.
+        any step, it logs a descriptive message for the failure and returns None.
 
         Args:
             badge_id (str): The unique ID of the badge to verify.
+            now_utc (datetime): Optional pre-computed current time, so batch
+                callers can read the clock once for the whole batch.
 
         Returns:
             dict: The JSON data object for the badge if it is fully verified.
             None: If the verification fails for any reason.
         """
         if not badge_id:
-            print("Verification Log: Badge ID cannot be empty.")
+            logger.info("Badge ID cannot be empty.")
             return None
 
+        if not _BADGE_ID_RE.match(badge_id):
+            logger.info('Badge ID "%s" is not a valid Credly GUID.', badge_id)
+            return None
+
+        cached = CredlyBadgeVerification._cache_lookup(badge_id, now_utc)
+        if cached is not None:
+            logger.info('Badge "%s" served from in-process cache.', badge_id)
+            return cached
+
         url = f"https://www.credly.com/api/v1/public_badges/{badge_id}"
-        
+
         try:
-            response = requests.get(url, timeout=10)
+            response = _get_with_retry(url, timeout=10)
             if response.status_code == 404:
-                print(f'Verification Log: Badge ID "{badge_id}" not found (404).')
+                logger.info('Badge ID "%s" not found (404).', badge_id)
                 return None
             response.raise_for_status()
-            badge_data = response.json().get('data', {})
+            badge_data = _json_loads(response.content).get('data', {})
         except requests.exceptions.RequestException as e:
-            print(f"Verification Log: API request failed: {e}")
+            logger.info("API request failed: %s", e)
             return None
         except ValueError:
-            print("Verification Log: Failed to parse JSON response from the API.")
+            logger.info("Failed to parse JSON response from the API.")
             return None
 
+        verified = CredlyBadgeVerification._validate_badge_data(badge_id, badge_data, now_utc)
+        if verified is not None:
+            CredlyBadgeVerification._cache_store(badge_id, verified)
+        return verified
+
+    @staticmethod
+    def _cache_lookup(badge_id, now_utc=None):
+        """
+        Returns the cached payload for badge_id if present and not yet
+        expired; evicts and returns None if the badge lapsed while cached.
+        """
+        with _BADGE_CACHE_LOCK:
+            badge_data = _BADGE_CACHE.get(badge_id)
+        if badge_data is None:
+            return None
+
+        expires_at_str = badge_data.get('expires_at')
+        if expires_at_str:
+            try:
+                if _is_expired(expires_at_str, now_utc):
+                    with _BADGE_CACHE_LOCK:
+                        _BADGE_CACHE.pop(badge_id, None)
+                    return None
+            except (ValueError, TypeError):
+                return None
+        return badge_data
+
+    @staticmethod
+    def get_cached(badge_id):
+        """
+        Returns the cached verified payload for badge_id, or None.
+
+        Lets other pipelines (e.g. the PDF extractor) reuse a previous
+        verification without touching the network.
+        """
+        return CredlyBadgeVerification._cache_lookup(badge_id)
+
+    @staticmethod
+    def _cache_store(badge_id, badge_data):
+        with _BADGE_CACHE_LOCK:
+            _BADGE_CACHE[badge_id] = badge_data
+
+    @classmethod
+    def verify_batch(cls, badge_ids):
+        """
+        Verifies a batch of badge IDs sequentially over the pooled session.
+
+        Because _SESSION is module-level, the whole batch reuses one
+        keep-alive TLS connection, so N badges pay for one handshake. Use
+        verify_many() instead when the calls should run concurrently.
+
+        Args:
+            badge_ids (list[str]): The badge IDs to verify.
+
+        Returns:
+            dict: Maps each badge ID to its badge data dict, or None if
+            that badge failed verification.
+        """
+        # One clock read for the whole batch instead of one per badge.
+        now_utc = datetime.now(timezone.utc)
+        results = {}
+        for badge_id in badge_ids:
+            results[badge_id] = cls.verify(badge_id, now_utc=now_utc)
+        return results
+
+    @staticmethod
+    def _validate_badge_data(badge_id, badge_data, now_utc=None):
+        """
+        Runs the state and expiry checks shared by the sync and async paths.
+
+        Returns the badge data dict if the badge is valid, otherwise None.
+        """
         state = badge_data.get('state')
         if state != 'accepted':
-            print(f'Verification Log: Badge state is "{state}", not "accepted".')
+            logger.info('Badge state is "%s", not "accepted".', state)
             return None
 
         expires_at_str = badge_data.get('expires_at')
         if expires_at_str:
             try:
-                expiration_date = datetime.fromisoformat(expires_at_str)
-                now_utc = datetime.now(timezone.utc)
-                if expiration_date < now_utc:
-                    print(f'Verification Log: Badge expired on {expiration_date.date()}.')
+                if _is_expired(expires_at_str, now_utc):
+                    logger.info('Badge expired on %s.', expires_at_str[:10])
                     return None
             except (ValueError, TypeError):
-                print(f'Verification Log: Could not parse expiration date: "{expires_at_str}"')
+                logger.info('Could not parse expiration date: "%s"', expires_at_str)
                 return None
 
-        print(f'Verification Log: Badge "{badge_id}" is technically valid. Extracting details...')
+        logger.info('Badge "%s" is technically valid. Extracting details...', badge_id)
         return badge_data
 
+    @staticmethod
+    async def verify_async(badge_id, session, now_utc=None):
+        """
+        Async version of verify() for concurrent batch verification.
+
+        Performs the same checks as verify() but issues the API call through
+        an aiohttp session so many badges can be verified in parallel.
+
+        Args:
+            badge_id (str): The unique ID of the badge to verify.
+            session (aiohttp.ClientSession): The session to issue the request on.
+
+        Returns:
+            dict: The JSON data object for the badge if it is fully verified.
+            None: If the verification fails for any reason.
+        """
+        if not badge_id:
+            logger.info("Badge ID cannot be empty.")
+            return None
+
+        if not _BADGE_ID_RE.match(badge_id):
+            logger.info('Badge ID "%s" is not a valid Credly GUID.', badge_id)
+            return None
+
+        cached = CredlyBadgeVerification._cache_lookup(badge_id, now_utc)
+        if cached is not None:
+            logger.info('Badge "%s" served from in-process cache.', badge_id)
+            return cached
+
+        url = f"https://www.credly.com/api/v1/public_badges/{badge_id}"
+
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 404:
+                    logger.info('Badge ID "%s" not found (404).', badge_id)
+                    return None
+                response.raise_for_status()
+                badge_data = (await response.json(loads=_json_loads)).get('data', {})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.info("API request failed: %s", e)
+            return None
+        except ValueError:
+            logger.info("Failed to parse JSON response from the API.")
+            return None
+
+        verified = CredlyBadgeVerification._validate_badge_data(badge_id, badge_data, now_utc)
+        if verified is not None:
+            CredlyBadgeVerification._cache_store(badge_id, verified)
+        return verified
+
+    @staticmethod
+    async def _verify_many_async(badge_ids):
+        now_utc = datetime.now(timezone.utc)
+        connector = aiohttp.TCPConnector(limit=50, limit_per_host=20)
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            tasks = [CredlyBadgeVerification.verify_async(bid, session, now_utc=now_utc)
+                     for bid in badge_ids]
+            return await asyncio.gather(*tasks)
+
+    @staticmethod
+    def verify_many(badge_ids):
+        """
+        Verifies a batch of badge IDs concurrently.
+
+        All API calls are issued in parallel (bounded by the per-host
+        connection limit), so a large batch costs roughly one round trip
+        instead of one per badge.
+
+        Args:
+            badge_ids (list[str]): The badge IDs to verify.
+
+        Returns:
+            list: One entry per badge ID, in order — the badge data dict if
+            that badge verified, otherwise None.
+        """
+        return asyncio.run(CredlyBadgeVerification._verify_many_async(badge_ids))
+
 
 # --- MAIN EXECUTION BLOCK ---
 if __name__ == "__main__":
+    # Show the verification log when run as a script.
+    logging.basicConfig(level=logging.INFO, format="Verification Log: %(message)s")
+
     badge_id_to_check = "f5deaadd-8abb-45d9-abfa-99d600ce9245" # Cisco Network Tech
     
     print(f"--- Attempting Full Verification for ID: {badge_id_to_check} ---")
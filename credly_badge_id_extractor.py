@@ -1,8 +1,59 @@
+import aiohttp
+import asyncio
+import ctypes
+import functools
+import logging
 import pdfplumber
+import random
 import re
+
+try:
+    # Optional fast path: PDFium extracts text/annotations without building
+    # pdfplumber's per-character layout tree, several times faster per page.
+    # The high-level API has no annotation helpers, so the raw bindings are
+    # needed to read /Link URIs.
+    import pypdfium2
+    import pypdfium2.raw as pdfium_c
+except ImportError:
+    pypdfium2 = None
+
+try:
+    # Optional: vectorizes the word-level line clustering in extract_page_lines.
+    import numpy as np
+except ImportError:
+    np = None
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Credliy import CredlyBadgeVerification
+
+# Shared session with a connection pool so repeated short-URL resolutions
+# reuse one keep-alive TLS connection to credly.com.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0))
+_SESSION.headers["User-Agent"] = "Mozilla/5.0"
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limits and transient server errors.
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Precompiled once at import so the per-page PDF loop doesn't pay the
+# pattern-cache lookup / compile cost on every search.
+# Credly /go/ codes redirect to a stable /badges/<guid>/print URL, so a
+# successful resolution can be reused for the life of the process. Failures
+# are deliberately not cached so a later retry can still succeed.
+_RESOLVED_URL_CACHE = {}
+
+_GUID_RE = re.compile(
+    r"/badges/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})/print",
+    re.IGNORECASE,
+)
+_SHORT_URL_RE = re.compile(r'https?://(?:www\.)?credly\.com/go/[a-zA-Z0-9]{4,12}\b', re.IGNORECASE)
+_LONG_URL_RE = re.compile(r'https?://(?:www\.)?credly\.com/badges/[a-zA-Z0-9-]+/print', re.IGNORECASE)
 
 # =================================================================
 # 1. CORE UTILITY FUNCTIONS
@@ -12,8 +63,7 @@ def extract_credly_id_from_url(credly_url):
     """
     Extracts the unique alphanumeric badge ID (GUID) from a long Credly 'badges/...' URL.
     """
-    guid_pattern = r"/badges/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})/print"
-    match = re.search(guid_pattern, credly_url, re.IGNORECASE) 
+    match = _GUID_RE.search(credly_url)
     if match:
         return match.group(1)
     return None
@@ -21,111 +71,321 @@ def extract_credly_id_from_url(credly_url):
 def resolve_credly_short_url(short_url, max_retries=3):
     """
     Follows a short Credly URL redirect with retries for network robustness.
+
+    Transient failures (timeouts, connection errors, 429/5xx) are retried with
+    jittered exponential backoff; other 4xx responses fail fast since a retry
+    cannot fix them.
     """
     if "credly.com" not in short_url.lower():
         return None
-    
-    # Print using the original URL's case
-    print(f"\nAttempting to resolve short URL: {short_url}...")
-    
+
+    cached = _RESOLVED_URL_CACHE.get(short_url)
+    if cached:
+        return cached
+
+    # Log using the original URL's case
+    logger.info("Attempting to resolve short URL: %s...", short_url)
+
     for attempt in range(max_retries):
         try:
-            response = requests.get(
+            # HEAD follows the redirect chain to response.url without
+            # downloading the destination HTML we'd only throw away.
+            response = _SESSION.head(
                 short_url, # <-- The actual request uses the case-sensitive URL
-                timeout=15, 
-                headers={'User-Agent': 'Mozilla/5.0'}
+                timeout=15,
+                allow_redirects=True
             )
-            
-            response.raise_for_status() 
-            return response.url
-            
+            if response.status_code == 405:
+                # Server refused HEAD; fall back to the full GET.
+                response = _SESSION.get(short_url, timeout=15)
+
+            if response.status_code in _RETRY_STATUSES:
+                logger.warning("⚠️ Attempt %d: Server returned %d.", attempt + 1, response.status_code)
+            elif not response.ok:
+                # Client errors (e.g. dead short code) won't succeed on retry.
+                logger.error("🛑 Resolution failed with status %d.", response.status_code)
+                return None
+            else:
+                _RESOLVED_URL_CACHE[short_url] = response.url
+                return response.url
+
         except requests.exceptions.Timeout:
-            print(f"⚠️ Attempt {attempt + 1}: Request timed out.")
+            logger.warning("⚠️ Attempt %d: Request timed out.", attempt + 1)
         except requests.exceptions.RequestException as e:
-            print(f"🛑 Attempt {attempt + 1}: Request failed ({e.__class__.__name__}). Check network/firewall.")
-        
+            logger.warning("🛑 Attempt %d: Request failed (%s). Check network/firewall.", attempt + 1, e.__class__.__name__)
+
         if attempt < max_retries - 1:
-            wait_time = 2 ** attempt
+            wait_time = min(30.0, 2 ** attempt) * (1 + random.uniform(-0.5, 0.5))
             time.sleep(wait_time)
 
     return None
 
+def resolve_credly_short_urls_batch(short_urls):
+    """
+    Resolves many short Credly URLs concurrently and fills the resolution cache.
+
+    Intended for batch PDF runs with resolve_urls=False: pre-resolving every
+    discovered /go/ URL in parallel takes the sequential redirect round trips
+    off the extractor's critical path, and later lookups hit the cache for free.
+
+    Returns a dict mapping each short URL to its long URL (or None on failure).
+    """
+    return asyncio.run(_resolve_short_urls_async(short_urls))
+
+async def _resolve_short_urls_async(short_urls):
+    results = {}
+    to_fetch = []
+    for url in short_urls:
+        if "credly.com" not in url.lower():
+            results[url] = None
+        elif url in _RESOLVED_URL_CACHE:
+            results[url] = _RESOLVED_URL_CACHE[url]
+        else:
+            to_fetch.append(url)
+
+    if to_fetch:
+        connector = aiohttp.TCPConnector(limit=50, limit_per_host=20)
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            resolved = await asyncio.gather(*[_resolve_one_async(u, session) for u in to_fetch])
+        for url, long_url in zip(to_fetch, resolved):
+            if long_url:
+                _RESOLVED_URL_CACHE[url] = long_url
+            results[url] = long_url
+
+    return results
+
+async def _resolve_one_async(short_url, session):
+    try:
+        async with session.head(
+            short_url, timeout=aiohttp.ClientTimeout(total=15), allow_redirects=True
+        ) as response:
+            if response.ok:
+                return str(response.url)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+    return None
+
 # =================================================================
 # 2. MAIN PDF PROCESSING FUNCTION
 # =================================================================
 # (This logic correctly finds the case-sensitive URL and passes it to the resolver)
 
-def process_certificate_pdf_complete(pdf_path):
-    # ... (omitted for brevity, as the logic is correct)
-    if not os.path.exists(pdf_path):
-        return {"pdf_text": "Error: File Not Found", "credly_id": None, "final_long_url": None, "found_url_in_pdf": None}
+def _pypdfium2_link_uris(pdf, page):
+    """
+    Yields the URI of every /Link annotation on a PDFium page.
 
-    full_text_list = [] 
+    pypdfium2 (checked against 5.13.0) exposes no annotation helpers on
+    PdfPage, so this walks the raw FPDFPage_GetAnnot* bindings and reads each
+    link's URI action with the usual two-call buffer dance.
+    """
+    for index in range(pdfium_c.FPDFPage_GetAnnotCount(page.raw)):
+        annot = pdfium_c.FPDFPage_GetAnnot(page.raw, index)
+        if not annot:
+            continue
+        try:
+            if pdfium_c.FPDFAnnot_GetSubtype(annot) != pdfium_c.FPDF_ANNOT_LINK:
+                continue
+            link = pdfium_c.FPDFAnnot_GetLink(annot)
+            action = pdfium_c.FPDFLink_GetAction(link) if link else None
+            if not action or pdfium_c.FPDFAction_GetType(action) != pdfium_c.PDFACTION_URI:
+                continue
+            n_bytes = pdfium_c.FPDFAction_GetURIPath(pdf.raw, action, None, 0)
+            if n_bytes < 1:
+                continue
+            buffer = ctypes.create_string_buffer(n_bytes)
+            pdfium_c.FPDFAction_GetURIPath(pdf.raw, action, buffer, n_bytes)
+            yield buffer.raw[:n_bytes].rstrip(b"\x00").decode("utf-8", errors="replace")
+        finally:
+            pdfium_c.FPDFPage_CloseAnnot(annot)
+
+def _scan_pdf_pypdfium2(pdf_path):
+    """
+    Scans a PDF with PDFium and returns (page_texts, found_url).
+
+    Same page ordering as the pdfplumber scan: link annotations first, then a
+    regex pass over the page text, stopping at the first Credly URL.
+    """
+    page_texts = []
     found_url = None
-    
-    short_url_pattern = r'https?://(?:www\.)?credly\.com/go/[a-zA-Z0-9]{4,12}\b'
-    long_url_pattern = r'https?://(?:www\.)?credly\.com/badges/[a-zA-Z0-9-]+/print'
-    
+
+    pdf = pypdfium2.PdfDocument(pdf_path)
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                
-                # --- Line-by-Line Text Extraction (Correctly preserves case) ---
-                words = page.extract_words(x_tolerance=3, y_tolerance=3, keep_blank_chars=False, extra_attrs=['top'])
-                words.sort(key=lambda w: (w['top'], w['x0']))
-
-                current_line = ""
-                last_top = None
-                
-                for word in words:
-                    if last_top is None or abs(word['top'] - last_top) > 5:
-                        if current_line: full_text_list.append(current_line.strip())
-                        current_line = word['text']
-                        last_top = word['top']
-                    else:
-                        current_line += " " + word['text']
-                
-                if current_line: full_text_list.append(current_line.strip())
-
-                full_text = "\n".join(full_text_list)
-                search_text = full_text.lower()
-                
-                # --- URL Search (This sets found_url to the correct case) ---
-                for annotation in page.annots:
-                    if annotation.get('Subtype') == '/Link' and 'A' in annotation:
-                        link_uri = annotation['A'].get('URI')
-                        if link_uri and "credly.com" in link_uri.lower():
-                            found_url = link_uri
-                            break
-                if found_url: break 
-
-            long_credly_url = None
-            
-            if not found_url:
-                match = re.search(short_url_pattern, full_text, re.IGNORECASE) or \
-                        re.search(long_url_pattern, full_text, re.IGNORECASE)
-                if match:
-                    # found_url is set to the case-sensitive text found in the PDF
-                    found_url = match.group(0) 
-
-            if found_url:
-                if "/go/" in found_url.lower():
+        for page in pdf:
+            for link_uri in _pypdfium2_link_uris(pdf, page):
+                if link_uri and "credly.com" in link_uri.lower():
+                    found_url = link_uri
+                    break
+            if found_url: break
+
+            page_text = page.get_textpage().get_text_range() or ""
+            page_texts.append(page_text)
+
+            match = _SHORT_URL_RE.search(page_text) or _LONG_URL_RE.search(page_text)
+            if match:
+                found_url = match.group(0)
+                break
+    finally:
+        pdf.close()
+
+    return page_texts, found_url
+
+def extract_page_lines(page):
+    """
+    Layout-preserving line reconstruction for a pdfplumber page.
+
+    Kept for callers that need the old word-level clustering instead of
+    extract_text's layout: words are sorted by (top, x0) and split into lines
+    wherever the vertical gap exceeds 5pt. With numpy available, the sort and
+    gap scan run vectorized over column arrays instead of per-word Python
+    dict lookups, which is several times faster on word-dense pages.
+    """
+    words = page.extract_words(x_tolerance=3, y_tolerance=3, keep_blank_chars=False, extra_attrs=['top'])
+    if not words:
+        return []
+
+    if np is None:
+        return _cluster_lines_python(words)
+
+    n = len(words)
+    tops = np.fromiter((w['top'] for w in words), dtype=np.float32, count=n)
+    x0s = np.fromiter((w['x0'] for w in words), dtype=np.float32, count=n)
+    order = np.lexsort((x0s, tops))
+    breaks = np.concatenate(([0], np.where(np.abs(np.diff(tops[order])) > 5)[0] + 1, [n]))
+    texts = [words[i]['text'] for i in order]
+    return [" ".join(texts[start:end]).strip() for start, end in zip(breaks[:-1], breaks[1:])]
+
+def _cluster_lines_python(words):
+    # Pure-Python fallback with the same consecutive-gap semantics as the
+    # vectorized path: last_top follows every word, so a line breaks only
+    # where adjacent words sit more than 5pt apart.
+    words = sorted(words, key=lambda w: (w['top'], w['x0']))
+
+    lines = []
+    current_line = ""
+    last_top = None
+
+    for word in words:
+        if last_top is None or abs(word['top'] - last_top) > 5:
+            if current_line: lines.append(current_line.strip())
+            current_line = word['text']
+        else:
+            current_line += " " + word['text']
+        last_top = word['top']
+
+    if current_line: lines.append(current_line.strip())
+    return lines
+
+def _scan_pdf_pdfplumber(pdf_path):
+    """
+    Scans a PDF with pdfplumber and returns (page_texts, found_url).
+    """
+    page_texts = []
+    found_url = None
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+
+            # --- URL Search (This sets found_url to the correct case) ---
+            # Annotations first: parsing them is nearly free, and most
+            # Credly PDFs carry the badge link as a /Link annotation, so
+            # a hit here skips the expensive text extraction entirely.
+            # pdfplumber flattens each annotation and surfaces the link
+            # target as a top-level 'uri' key (the raw /Subtype and /A
+            # entries only exist under 'data').
+            for annotation in page.annots:
+                link_uri = annotation.get('uri')
+                if link_uri and "credly.com" in link_uri.lower():
+                    found_url = link_uri
+                    break
+            if found_url: break
+
+            # Scanned/image-only pages have no extractable text — skip the
+            # extraction cost; the annotation scan above is all they offer.
+            if not page.chars:
+                continue
+
+            # --- Page Text Extraction (Correctly preserves case) ---
+            # pdfplumber's built-in extract_text runs the same word
+            # clustering as the old manual sort/reassemble loop, but in
+            # its layout engine rather than per-word Python.
+            page_text = page.extract_text(x_tolerance=3, y_tolerance=3) or ""
+            page_texts.append(page_text)
+
+            # Regex fallback on this page's text, so we can stop parsing
+            # the remaining pages as soon as a URL turns up.
+            match = _SHORT_URL_RE.search(page_text) or _LONG_URL_RE.search(page_text)
+            if match:
+                # found_url is set to the case-sensitive text found in the PDF
+                found_url = match.group(0)
+                break
+
+    return page_texts, found_url
+
+def process_certificate_pdf_complete(pdf_path, resolve_urls=True):
+    # With resolve_urls=False no network call is made here: a found short URL
+    # is returned as-is (only the free cache is consulted), so callers can
+    # batch-resolve across many PDFs with resolve_credly_short_urls_batch.
+    if not os.path.exists(pdf_path):
+        return {"pdf_text": "Error: File Not Found", "credly_id": None, "final_long_url": None, "found_url_in_pdf": None, "verified_badge": None}
+
+    try:
+        page_texts = None
+        if pypdfium2 is not None:
+            try:
+                page_texts, found_url = _scan_pdf_pypdfium2(pdf_path)
+            except Exception:
+                # PDFium choked on this file — retry with pdfplumber below.
+                page_texts = None
+        if page_texts is None:
+            page_texts, found_url = _scan_pdf_pdfplumber(pdf_path)
+
+        # Joined once after the loop — doing this per page is O(pages^2).
+        full_text = "\n".join(page_texts)
+
+        long_credly_url = None
+
+        if found_url:
+            if "/go/" in found_url.lower():
+                if resolve_urls:
                     # Resolves the short URL (uses the correct case)
                     long_credly_url = resolve_credly_short_url(found_url)
-                elif "/badges/" in found_url.lower():
-                    long_credly_url = found_url
-
-            credly_id = extract_credly_id_from_url(long_credly_url) if long_credly_url else None
-            
-            return {
-                "pdf_text": full_text,
-                "credly_id": credly_id,
-                "final_long_url": long_credly_url,
-                "found_url_in_pdf": found_url 
-            }
+                else:
+                    long_credly_url = _RESOLVED_URL_CACHE.get(found_url)
+            elif "/badges/" in found_url.lower():
+                long_credly_url = found_url
+
+        credly_id = extract_credly_id_from_url(long_credly_url) if long_credly_url else None
+
+        # Re-uploads of the same certificate hit the verification TTL cache,
+        # so the verified payload comes back with the extraction for free.
+        verified_badge = CredlyBadgeVerification.get_cached(credly_id) if credly_id else None
+
+        return {
+            "pdf_text": full_text,
+            "credly_id": credly_id,
+            "final_long_url": long_credly_url,
+            "found_url_in_pdf": found_url,
+            "verified_badge": verified_badge
+        }
 
     except Exception as e:
-        return {"pdf_text": f"Error during processing: {e}", "credly_id": None, "final_long_url": None, "found_url_in_pdf": None}
+        return {"pdf_text": f"Error during processing: {e}", "credly_id": None, "final_long_url": None, "found_url_in_pdf": None, "verified_badge": None}
+
+def process_many(pdf_paths, resolve_urls=False):
+    """
+    Processes many certificate PDFs in parallel, one worker per CPU core.
+
+    PDF parsing is CPU-bound Python, so this fans out with processes (threads
+    would serialize on the GIL). Workers skip network resolution by default;
+    run resolve_credly_short_urls_batch on the collected short URLs afterwards
+    to resolve them all in one concurrent pass.
+
+    Returns the result dicts in the same order as pdf_paths.
+    """
+    worker = functools.partial(process_certificate_pdf_complete, resolve_urls=resolve_urls)
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(worker, pdf_paths))
 
 
 # =================================================================
@@ -133,6 +393,9 @@ def process_certificate_pdf_complete(pdf_path):
 # =================================================================
 
 if __name__ == "__main__":
+    # Show resolution progress when run as a script.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # 1. Define the path to your certificate PDF file
     pdf_file_path = 'AWS_Academy_Graduate___AWS_Academy_Cloud_Foundations_Badge20250121-25-u7aks6.pdf' 
 